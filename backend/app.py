@@ -1,14 +1,26 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, g, has_app_context
 from flask_cors import CORS
 import requests
 import json
 import logging
 import os
+import time
+import sqlalchemy as sa
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.orm.exc import StaleDataError
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
+import math
+import sqlite3
+import glob
+import click
 import secrets
+import threading
+import queue
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from functools import wraps
 
 # Load environment variables
@@ -33,7 +45,44 @@ db_dir = os.path.dirname(db_path)
 if db_dir and not os.path.exists(db_dir):
     os.makedirs(db_dir)
 
-db = SQLAlchemy(app)
+# Group commit configuration - coalesce concurrent single-row inserts into one commit
+GROUP_COMMIT_ENABLED = os.getenv('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', '5'))
+GROUP_COMMIT_MAX_ROWS = int(os.getenv('GROUP_COMMIT_MAX_ROWS', '64'))
+GROUP_COMMIT_TIMEOUT_SECONDS = float(os.getenv('GROUP_COMMIT_TIMEOUT_SECONDS', '10'))
+
+# Sharding configuration - user-scoped tables are spread over SHARD_COUNT SQLite files,
+# while users and the shard directory stay in the global database above
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '1'))
+SHARDED_TABLES = {'transactions', 'budgets', 'archived_totals', 'data_versions', 'change_log'}
+REBALANCE_GRACE_SECONDS = float(os.getenv('REBALANCE_GRACE_SECONDS', '1'))
+LEGACY_SHARD = -1  # Users without a directory entry still live in the global database, as before sharding
+
+def shard_url(index):
+    """Database URL of one shard, derived from the global DATABASE_URL"""
+    root, ext = os.path.splitext(database_url)
+    return f"{root}_shard_{index}{ext}"
+
+if SHARD_COUNT > 1:
+    app.config['SQLALCHEMY_BINDS'] = {f'shard_{i}': shard_url(i) for i in range(SHARD_COUNT)}
+
+class ShardedSession(Session):
+    """Session that sends queries on user-scoped tables to the current user's shard"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and mapper is not None and SHARD_COUNT > 1:
+            if sa.inspect(mapper).local_table.name in SHARDED_TABLES:
+                return current_shard_engine()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={'class_': ShardedSession})
+
+# Archive configuration - transactions older than the horizon move to per-year files
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', '')  # Defaults to the directory of the database file
+ARCHIVE_HORIZON_DAYS = int(os.getenv('ARCHIVE_HORIZON_DAYS', '730'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+MAX_ATTACHED_ARCHIVES = 8  # SQLite allows 10 attached databases by default
+ARCHIVE_ID_LOOKUP_BATCH = 100  # Ids per archive query; times MAX_ATTACHED_ARCHIVES stays under 999 parameters
 
 # Authentication decorator
 def login_required(f):
@@ -44,6 +93,180 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Rate limiting configuration - token buckets keyed by user (or IP when logged out)
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_CAPACITY = float(os.getenv('RATE_LIMIT_CAPACITY', '60'))
+RATE_LIMIT_REFILL_PER_SECOND = float(os.getenv('RATE_LIMIT_REFILL_PER_SECOND', '1'))
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', '')  # Share buckets between worker processes through this SQLite file
+LLM_REQUEST_COST = float(os.getenv('LLM_REQUEST_COST', '10'))
+CRUD_REQUEST_COST = float(os.getenv('CRUD_REQUEST_COST', '1'))
+RATE_LIMIT_USAGE_RETENTION_SECONDS = int(os.getenv('RATE_LIMIT_USAGE_RETENTION_SECONDS', '86400'))  # RATE_LIMIT_DB rows idle this long are deleted
+
+class TokenBucketLimiter:
+    """In-process token buckets with per-key usage counters.
+    
+    Buckets live in an LRU map capped at MAX_BUCKETS keys; the least recently used key
+    is dropped together with its counters, so memory stays bounded without scanning.
+    """
+    
+    MAX_BUCKETS = 10000
+    
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def consume(self, key, cost):
+        """Take cost tokens from the key's bucket; return 0 if allowed, else seconds to wait"""
+        cost = min(cost, self.capacity)
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {'tokens': self.capacity, 'updated': now,
+                                               'requests': 0, 'cost': 0, 'rejected': 0}
+            else:
+                self._buckets.move_to_end(key)
+            tokens = min(self.capacity, bucket['tokens'] + (now - bucket['updated']) * self.refill_rate)
+            if tokens >= cost:
+                tokens -= cost
+                bucket['requests'] += 1
+                bucket['cost'] += cost
+                retry_after = 0
+            else:
+                bucket['rejected'] += 1
+                retry_after = (cost - tokens) / self.refill_rate
+            bucket.update(tokens=tokens, updated=now)
+            while len(self._buckets) > self.MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        return retry_after
+    
+    def usage(self, key):
+        """Usage counters and remaining tokens of one key"""
+        now = time.time()
+        with self._lock:
+            bucket = dict(self._buckets.get(key) or {'tokens': self.capacity, 'updated': now,
+                                                     'requests': 0, 'cost': 0, 'rejected': 0})
+        updated = bucket.pop('updated')
+        bucket['tokens'] = min(self.capacity, bucket['tokens'] + (now - updated) * self.refill_rate)
+        return bucket
+
+class SQLiteTokenBucketLimiter(TokenBucketLimiter):
+    """Token buckets stored in a separate SQLite file so all worker processes share them.
+    
+    Rows not updated for retention_seconds are deleted, at most once per EXPIRE_INTERVAL
+    seconds per process. Retention never drops below the time a bucket takes to refill.
+    If the file stays locked past the connection timeout, requests are let through.
+    """
+    
+    EXPIRE_INTERVAL = 60
+    
+    def __init__(self, capacity, refill_rate, path, retention_seconds):
+        super().__init__(capacity, refill_rate)
+        self.path = path
+        self.retention_seconds = max(retention_seconds, capacity / refill_rate)
+        self._local = threading.local()
+        self._next_expiry = 0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+            "updated REAL NOT NULL, requests INTEGER NOT NULL DEFAULT 0, cost REAL NOT NULL DEFAULT 0, "
+            "rejected INTEGER NOT NULL DEFAULT 0)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_updated ON rate_limits (updated)")
+    
+    def _connection(self):
+        if not hasattr(self._local, 'connection'):
+            self._local.connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.connection.execute('PRAGMA journal_mode=WAL')
+        return self._local.connection
+    
+    def consume(self, key, cost):
+        cost = min(cost, self.capacity)
+        now = time.time()
+        connection = self._connection()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute("SELECT tokens, updated FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+            allowed = tokens >= cost
+            retry_after = 0 if allowed else (cost - tokens) / self.refill_rate
+            connection.execute(
+                "INSERT INTO rate_limits (key, tokens, updated, requests, cost, rejected) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "requests = requests + excluded.requests, cost = cost + excluded.cost, "
+                "rejected = rejected + excluded.rejected",
+                (key, tokens - cost if allowed else tokens, now,
+                 int(allowed), cost if allowed else 0, int(not allowed))
+            )
+            connection.execute('COMMIT')
+        except sqlite3.OperationalError as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            # Another process held the database past the timeout; fail open rather than erroring
+            logger.warning(f"Rate limit check skipped for {key}: {e}")
+            return 0
+        except Exception:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        if now >= self._next_expiry:
+            self._next_expiry = now + self.EXPIRE_INTERVAL
+            self._expire(connection, now)
+        return retry_after
+    
+    def _expire(self, connection, now):
+        try:
+            connection.execute("DELETE FROM rate_limits WHERE updated < ?", (now - self.retention_seconds,))
+        except sqlite3.OperationalError as e:
+            # Another process holds the write lock; the next interval tries again
+            logger.warning(f"Could not expire rate limit rows: {e}")
+    
+    def usage(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT tokens, updated, requests, cost, rejected FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return {'requests': 0, 'cost': 0, 'rejected': 0, 'tokens': self.capacity}
+        tokens, updated, requests_made, cost, rejected = row
+        return {
+            'requests': requests_made,
+            'cost': cost,
+            'rejected': rejected,
+            'tokens': min(self.capacity, tokens + (now - updated) * self.refill_rate),
+        }
+
+if RATE_LIMIT_DB:
+    rate_limiter = SQLiteTokenBucketLimiter(RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SECOND, RATE_LIMIT_DB,
+                                            RATE_LIMIT_USAGE_RETENTION_SECONDS)
+else:
+    rate_limiter = TokenBucketLimiter(RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SECOND)
+
+def rate_limit_key():
+    """Bucket key of the current request: the logged-in user, or the client IP"""
+    if 'user_id' in session:
+        return f"user:{session['user_id']}"
+    return f"ip:{request.remote_addr}"
+
+# Rate limiting decorator
+def rate_limited(cost):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if RATE_LIMIT_ENABLED:
+                retry_after = rate_limiter.consume(rate_limit_key(), cost)
+                if retry_after:
+                    return jsonify({
+                        'error': 'Too many requests, please slow down',
+                        'retry_after': math.ceil(retry_after)
+                    }), 429, {'Retry-After': str(math.ceil(retry_after))}
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 # Database Models
 class User(db.Model):
     __tablename__ = 'users'
@@ -92,6 +315,8 @@ class User(db.Model):
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    # AUTOINCREMENT so ids of rows moved to the archive files are never handed out again
+    __table_args__ = (db.Index('ix_transactions_user_date', 'user_id', 'date'), {'sqlite_autoincrement': True})
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -113,7 +338,8 @@ class Transaction(db.Model):
             'amount': self.amount,
             'category': self.category,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived': False
         }
 
 class Budget(db.Model):
@@ -134,6 +360,7 @@ class Budget(db.Model):
             Transaction.category == self.name,
             Transaction.type == 'expense'
         ).scalar() or 0
+        expenses += archived_total(self.user_id, 'expense', self.name)
         
         # Calculate income for this category for this user
         category_income = db.session.query(db.func.sum(Transaction.amount)).filter(
@@ -141,12 +368,14 @@ class Budget(db.Model):
             Transaction.category == self.name,
             Transaction.type == 'income'
         ).scalar() or 0
+        category_income += archived_total(self.user_id, 'income', self.name)
         
         # Calculate total income from all transactions for this user
         total_user_income = db.session.query(db.func.sum(Transaction.amount)).filter(
             Transaction.user_id == self.user_id,
             Transaction.type == 'income'
         ).scalar() or 0
+        total_user_income += archived_total(self.user_id, 'income')
         
         # Calculate remaining: budget + total income - expenses
         remaining = self.budgetLimit + total_user_income - expenses
@@ -165,6 +394,679 @@ class Budget(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class ArchivedTotal(db.Model):
+    """Running totals of transactions moved into the yearly archive files"""
+    __tablename__ = 'archived_totals'
+    __table_args__ = (db.UniqueConstraint('user_id', 'year', 'type', 'category'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    year = db.Column(db.String(4), nullable=False)
+    type = db.Column(db.String(10), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    amount = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+def archived_total(user_id, type=None, category=None, column='amount'):
+    """Sum the archived amount (or row count) for a user, so all-time totals never attach archives"""
+    query = db.session.query(db.func.sum(getattr(ArchivedTotal, column))).filter(
+        ArchivedTotal.user_id == user_id
+    )
+    if type:
+        query = query.filter(ArchivedTotal.type == type)
+    if category:
+        query = query.filter(ArchivedTotal.category == category)
+    return query.scalar() or 0
+
+class DataVersion(db.Model):
+    """Per-user counter bumped by every mutation, used to key caches of derived data"""
+    __tablename__ = 'data_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    # Change log entries up to this version have been compacted away
+    compacted_version = db.Column(db.Integer, nullable=False, default=0)
+
+class ChangeLog(db.Model):
+    """One entry per mutation of a user's transactions or budgets, read by /api/sync"""
+    __tablename__ = 'change_log'
+    __table_args__ = (db.Index('ix_change_log_user_version', 'user_id', 'version'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(20), nullable=False)  # 'transaction' or 'budget'
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def bump_data_version(user_id, connection=None):
+    """Increment the user's data version as part of the current transaction and return it.
+    
+    Runs on db.session unless a Core connection (e.g. the group-commit writer's) is given.
+    """
+    executor = connection if connection is not None else db.session
+    version = executor.execute(
+        sa.update(DataVersion)
+        .where(DataVersion.user_id == user_id)
+        .values(version=DataVersion.version + 1)
+        .returning(DataVersion.version)
+    ).scalar()
+    if version is None:
+        version = 1
+        executor.execute(sa.insert(DataVersion).values(user_id=user_id, version=version))
+    return version
+
+def record_change(user_id, entity, entity_id, op='upsert', connection=None):
+    """Bump the user's data version and log the change under it, in the current transaction"""
+    executor = connection if connection is not None else db.session
+    version = bump_data_version(user_id, connection)
+    executor.execute(sa.insert(ChangeLog).values(
+        user_id=user_id, version=version, entity=entity, entity_id=entity_id,
+        op=op, created_at=datetime.utcnow()
+    ))
+    return version
+
+def get_data_version(user_id):
+    """Current data version of a user (0 before their first change)"""
+    version = db.session.get(DataVersion, user_id)
+    return version.version if version else 0
+
+# Group commit
+class GroupCommitWriter:
+    """Background writer that commits queued single-row inserts together.
+    
+    Requests submit a row and wait on the returned future; the writer collects
+    rows for up to GROUP_COMMIT_WINDOW_MS (or GROUP_COMMIT_MAX_ROWS rows), inserts
+    them in one transaction and resolves each future with the inserted row only
+    after the commit, so a response still means the row is durable. Futures
+    cancelled before their group starts are dropped without inserting the row.
+    """
+    
+    def __init__(self, engine, window_ms, max_rows):
+        self.engine = engine
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, model, values):
+        """Queue one row for insertion; the future resolves to the stored row as a dict"""
+        future = Future()
+        self._queue.put((model, values, future))
+        return future
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            # Skip rows whose request gave up waiting; the rest can no longer be cancelled
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if batch:
+                self._commit(batch)
+    
+    def _insert(self, connection, model, values):
+        row_id = connection.execute(sa.insert(model).values(**values).returning(model.id)).scalar()
+        record_change(values['user_id'], model.__name__.lower(), row_id, connection=connection)
+        # Read the row back (RETURNING reports values before column affinity, e.g. 5 for 5.0)
+        return dict(connection.execute(sa.select(model.__table__).where(model.id == row_id)).mappings().one())
+    
+    def _commit(self, batch):
+        try:
+            with self.engine.begin() as connection:
+                rows = [self._insert(connection, model, values) for model, values, _ in batch]
+        except Exception as e:
+            logger.warning(f"Group commit of {len(batch)} rows failed, retrying one by one: {e}")
+            # Commit rows individually so one bad row does not fail the whole group
+            for model, values, future in batch:
+                try:
+                    with self.engine.begin() as connection:
+                        future.set_result(self._insert(connection, model, values))
+                except Exception as row_error:
+                    future.set_exception(row_error)
+            return
+        for (_, _, future), row in zip(batch, rows):
+            future.set_result(row)
+
+group_commit_writers = {}
+group_commit_writers_lock = threading.Lock()
+
+def group_commit_writer(engine):
+    """Writer for an engine, started on first use so it runs in the serving process"""
+    with group_commit_writers_lock:
+        writer = group_commit_writers.get(engine)
+        if writer is None:
+            writer = GroupCommitWriter(engine, GROUP_COMMIT_WINDOW_MS, GROUP_COMMIT_MAX_ROWS)
+            group_commit_writers[engine] = writer
+        return writer
+
+# Change log compaction
+CHANGE_LOG_RETENTION_DAYS = int(os.getenv('CHANGE_LOG_RETENTION_DAYS', '30'))
+
+def compact_change_log(engine, retention_days=None):
+    """Shrink one shard's change log.
+    
+    Entries superseded by a newer change to the same row are always dropped;
+    entries older than the retention period are dropped as well, and the user's
+    compacted_version is raised so clients that far behind do a full sync.
+    """
+    retention_days = CHANGE_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    change_log = ChangeLog.__table__
+    data_versions = DataVersion.__table__
+    
+    with engine.begin() as connection:
+        latest = sa.select(
+            change_log.c.user_id, change_log.c.entity, change_log.c.entity_id,
+            sa.func.max(change_log.c.version).label('version')
+        ).group_by(change_log.c.user_id, change_log.c.entity, change_log.c.entity_id).subquery()
+        superseded = connection.execute(
+            change_log.delete().where(sa.exists().where(
+                latest.c.user_id == change_log.c.user_id,
+                latest.c.entity == change_log.c.entity,
+                latest.c.entity_id == change_log.c.entity_id,
+                latest.c.version > change_log.c.version
+            ))
+        ).rowcount
+        
+        expired = connection.execute(
+            sa.select(change_log.c.user_id, sa.func.max(change_log.c.version))
+            .where(change_log.c.created_at < cutoff)
+            .group_by(change_log.c.user_id)
+        ).all()
+        for user_id, version in expired:
+            connection.execute(
+                data_versions.update()
+                .where(data_versions.c.user_id == user_id, data_versions.c.compacted_version < version)
+                .values(compacted_version=version)
+            )
+        removed = connection.execute(change_log.delete().where(change_log.c.created_at < cutoff)).rowcount
+    return superseded + removed
+
+@app.cli.command('compact-change-log')
+@click.option('--retention-days', type=int, default=None, help='Drop change log entries older than this many days')
+def compact_change_log_command(retention_days):
+    """Compact the sync change log on every shard"""
+    init_database()
+    removed = sum(compact_change_log(engine, retention_days) for engine in shard_engines())
+    click.echo(f"Removed {removed} change log entries")
+
+# Transaction archiving (hot/cold partitioning)
+TRANSACTION_COLUMNS = ['id', 'user_id', 'date', 'title', 'type', 'amount', 'category', 'notes', 'created_at']
+
+ARCHIVE_TABLE_DDL = """CREATE TABLE IF NOT EXISTS {alias}.transactions (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    date VARCHAR(10) NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    type VARCHAR(10) NOT NULL,
+    amount FLOAT NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    notes TEXT,
+    created_at DATETIME
+)"""
+
+ARCHIVE_INDEX_DDL = "CREATE INDEX IF NOT EXISTS {alias}.ix_transactions_user_date ON transactions (user_id, date)"
+
+def archive_path(db_file, year):
+    """Path of the archive file holding one year of transactions for a database file"""
+    directory = ARCHIVE_DIR or os.path.dirname(os.path.abspath(db_file))
+    stem = os.path.splitext(os.path.basename(db_file))[0]
+    return os.path.join(directory, f"{stem}_archive_{year}.db")
+
+def archive_years(db_file, start_date=None, end_date=None):
+    """List the archived years of a database file that overlap the requested date range"""
+    years = []
+    for path in glob.glob(archive_path(db_file, '[0-9][0-9][0-9][0-9]')):
+        year = os.path.splitext(path)[0][-4:]
+        if start_date and year < start_date[:4]:
+            continue
+        if end_date and year > end_date[:4]:
+            continue
+        years.append(year)
+    return sorted(years)
+
+def _archived_row_to_dict(row):
+    """Shape a raw archive row like Transaction.to_dict; archived rows are read-only"""
+    data = dict(zip(TRANSACTION_COLUMNS, row))
+    if data['created_at']:
+        data['created_at'] = datetime.fromisoformat(data['created_at']).isoformat()
+    data['archived'] = True
+    return data
+
+def fetch_archived_transactions(engine, user_id, start_date=None, end_date=None, ids=None):
+    """Read a user's archived transactions, attaching only the years the range needs.
+    
+    With ids, only those transactions are returned.
+    """
+    db_file = engine.url.database
+    years = archive_years(db_file, start_date, end_date)
+    if not years or ids is not None and not ids:
+        return []
+    
+    conditions = ['user_id = ?']
+    params = [user_id]
+    if start_date:
+        conditions.append('date >= ?')
+        params.append(start_date)
+    if end_date:
+        conditions.append('date <= ?')
+        params.append(end_date)
+    # Each year repeats the id list, so split it to stay under SQLite's bound parameter limit
+    id_batches = [None] if ids is None else [
+        list(ids)[i:i + ARCHIVE_ID_LOOKUP_BATCH] for i in range(0, len(ids), ARCHIVE_ID_LOOKUP_BATCH)
+    ]
+    columns = ', '.join(TRANSACTION_COLUMNS)
+    
+    rows = []
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for i in range(0, len(years), MAX_ATTACHED_ARCHIVES):
+            chunk = years[i:i + MAX_ATTACHED_ARCHIVES]
+            for year in chunk:
+                cursor.execute(f"ATTACH DATABASE ? AS archive_{year}", (archive_path(db_file, year),))
+            try:
+                for id_batch in id_batches:
+                    where = ' AND '.join(conditions if id_batch is None else
+                                         conditions + [f"id IN ({', '.join('?' * len(id_batch))})"])
+                    batch_params = params if id_batch is None else params + id_batch
+                    sql = ' UNION ALL '.join(
+                        f"SELECT {columns} FROM archive_{year}.transactions WHERE {where}" for year in chunk
+                    )
+                    cursor.execute(sql, batch_params * len(chunk))
+                    rows.extend(cursor.fetchall())
+            finally:
+                for year in chunk:
+                    cursor.execute(f"DETACH DATABASE archive_{year}")
+        cursor.close()
+    finally:
+        connection.close()
+    return [_archived_row_to_dict(row) for row in rows]
+
+def transaction_id_high_water(connection, schema='main'):
+    """Highest transaction id ever handed out in a database (its AUTOINCREMENT counter)"""
+    row = connection.execute(
+        f"SELECT seq FROM {schema}.sqlite_sequence WHERE name = 'transactions'"
+    ).fetchone()
+    return row[0] if row else 0
+
+def raise_transaction_id_high_water(connection, seq, schema='main'):
+    """Make sure new transaction ids start above seq; the counter is never lowered"""
+    row = connection.execute(
+        f"SELECT seq FROM {schema}.sqlite_sequence WHERE name = 'transactions'"
+    ).fetchone()
+    if row is None:
+        connection.execute(f"INSERT INTO {schema}.sqlite_sequence (name, seq) VALUES ('transactions', ?)", (seq,))
+    elif row[0] < seq:
+        connection.execute(f"UPDATE {schema}.sqlite_sequence SET seq = ? WHERE name = 'transactions'", (seq,))
+
+def reserve_transaction_ids(connection, count, schema='main'):
+    """Reserve count ids from a database's transaction counter and return the last id before them"""
+    base = transaction_id_high_water(connection, schema)
+    raise_transaction_id_high_water(connection, base + count, schema)
+    return base
+
+def _max_archived_transaction_id(connection, db_file):
+    highest = 0
+    for year in archive_years(db_file):
+        connection.execute("ATTACH DATABASE ? AS archive", (archive_path(db_file, year),))
+        try:
+            highest = max(highest, connection.execute("SELECT MAX(id) FROM archive.transactions").fetchone()[0] or 0)
+        finally:
+            connection.execute("DETACH DATABASE archive")
+    return highest
+
+def migrate_transaction_ids(engine):
+    """Give an existing transactions table AUTOINCREMENT ids that stay above every archived id.
+    
+    Tables created before ids were made monotonic are rebuilt with the same rows,
+    and the id counter is raised past the highest id in the archive files so
+    hot and archived ids can never collide.
+    """
+    db_file = engine.url.database
+    connection = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    try:
+        archived_max = _max_archived_transaction_id(connection, db_file)
+        columns = ', '.join(TRANSACTION_COLUMNS)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            table_sql = connection.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+            ).fetchone()[0]
+            if 'AUTOINCREMENT' not in table_sql.upper():
+                table = Transaction.__table__
+                connection.execute("ALTER TABLE transactions RENAME TO transactions_before_autoincrement")
+                for index in table.indexes:
+                    connection.execute(f"DROP INDEX IF EXISTS {index.name}")
+                connection.execute(str(sa.schema.CreateTable(table).compile(dialect=engine.dialect)))
+                for index in table.indexes:
+                    connection.execute(str(sa.schema.CreateIndex(index).compile(dialect=engine.dialect)))
+                connection.execute(
+                    f"INSERT INTO transactions ({columns}) SELECT {columns} FROM transactions_before_autoincrement"
+                )
+                connection.execute("DROP TABLE transactions_before_autoincrement")
+                logger.info(f"Rebuilt transactions table in {db_file} with AUTOINCREMENT ids")
+            hot_max = connection.execute("SELECT MAX(id) FROM transactions").fetchone()[0] or 0
+            raise_transaction_id_high_water(connection, max(hot_max, archived_max))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+    finally:
+        connection.close()
+
+def archive_old_transactions(db_file, horizon_days=None, batch_size=None):
+    """Move transactions older than the horizon into per-year archive files.
+    
+    Rows are moved in small batches, each in its own short write transaction,
+    so the app keeps serving writes while the archiver runs.
+    """
+    horizon_days = ARCHIVE_HORIZON_DAYS if horizon_days is None else horizon_days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    cutoff = (datetime.utcnow() - timedelta(days=horizon_days)).strftime('%Y-%m-%d')
+    columns = ', '.join(TRANSACTION_COLUMNS)
+    moved = 0
+    
+    connection = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    try:
+        years = [
+            row[0] for row in connection.execute(
+                "SELECT DISTINCT substr(date, 1, 4) FROM transactions WHERE date < ?", (cutoff,)
+            )
+            if row[0] and row[0].isdigit() and len(row[0]) == 4
+        ]
+        for year in years:
+            alias = f"archive_{year}"
+            connection.execute(f"ATTACH DATABASE ? AS {alias}", (archive_path(db_file, year),))
+            try:
+                connection.execute(ARCHIVE_TABLE_DDL.format(alias=alias))
+                connection.execute(ARCHIVE_INDEX_DDL.format(alias=alias))
+                while True:
+                    connection.execute('BEGIN IMMEDIATE')
+                    try:
+                        ids = [row[0] for row in connection.execute(
+                            "SELECT id FROM main.transactions WHERE date < ? AND substr(date, 1, 4) = ? ORDER BY id LIMIT ?",
+                            (cutoff, year, batch_size)
+                        )]
+                        if not ids:
+                            connection.execute('COMMIT')
+                            break
+                        if max(ids) > transaction_id_high_water(connection):
+                            # Deleting these rows would let SQLite hand their ids out again
+                            raise RuntimeError(
+                                f"Transaction ids in {db_file} are not monotonic; restart the app to migrate the table"
+                            )
+                        placeholders = ', '.join('?' * len(ids))
+                        connection.execute(
+                            f"INSERT INTO {alias}.transactions ({columns}) "
+                            f"SELECT {columns} FROM main.transactions WHERE id IN ({placeholders})",
+                            ids
+                        )
+                        connection.execute(
+                            "INSERT INTO main.archived_totals (user_id, year, type, category, amount, count) "
+                            f"SELECT user_id, ?, type, category, SUM(amount), COUNT(*) FROM main.transactions "
+                            f"WHERE id IN ({placeholders}) GROUP BY user_id, type, category "
+                            "ON CONFLICT (user_id, year, type, category) DO UPDATE SET "
+                            "amount = amount + excluded.amount, count = count + excluded.count",
+                            [year] + ids
+                        )
+                        connection.execute(f"DELETE FROM main.transactions WHERE id IN ({placeholders})", ids)
+                        connection.execute('COMMIT')
+                    except Exception:
+                        connection.execute('ROLLBACK')
+                        raise
+                    moved += len(ids)
+            finally:
+                connection.execute(f"DETACH DATABASE {alias}")
+            logger.info(f"Archived transactions for {year} into {archive_path(db_file, year)}")
+    finally:
+        connection.close()
+    return moved
+
+@app.cli.command('archive-transactions')
+@click.option('--horizon-days', type=int, default=None, help='Archive transactions older than this many days')
+def archive_transactions_command(horizon_days):
+    """Archive old transactions into per-year SQLite files (safe to run while the app is serving)"""
+    init_database()
+    moved = sum(archive_old_transactions(engine.url.database, horizon_days) for engine in shard_engines())
+    click.echo(f"Archived {moved} transactions")
+
+class ShardAssignment(db.Model):
+    """Directory entry pinning a user to a shard (lives in the global database)"""
+    __tablename__ = 'shard_directory'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    shard = db.Column(db.Integer, nullable=False)
+    moving = db.Column(db.Boolean, default=False)
+
+# Shard routing
+def hash_shard(user_id):
+    """Default shard for a user, stable across processes and restarts"""
+    return int(hashlib.sha1(str(user_id).encode()).hexdigest(), 16) % SHARD_COUNT
+
+def shard_engine(index):
+    """Engine holding the user-scoped tables of one shard"""
+    if SHARD_COUNT == 1 or index == LEGACY_SHARD:
+        return db.engine
+    return db.engines[f'shard_{index}']
+
+def shard_engines():
+    """Engines of every shard, for maintenance jobs that touch all user data.
+    
+    With sharding enabled this includes the global database, which keeps the data of
+    users that rebalance-shards has not moved yet.
+    """
+    engines = [shard_engine(i) for i in range(SHARD_COUNT)]
+    if SHARD_COUNT > 1:
+        engines.append(db.engine)
+    return engines
+
+def current_shard_engine():
+    """Engine of the shard selected for the current request or command"""
+    if not has_app_context() or 'shard_id' not in g:
+        raise RuntimeError('No shard selected for a user-scoped query')
+    return shard_engine(g.shard_id)
+
+def shard_for_user(user_id):
+    """Look up a user's shard in the directory; users not in it are still in the global database"""
+    if SHARD_COUNT == 1:
+        return 0
+    assignment = db.session.get(ShardAssignment, user_id)
+    return assignment.shard if assignment else LEGACY_SHARD
+
+class ShardCountError(RuntimeError):
+    """SHARD_COUNT is lower than the shards users are still assigned to"""
+
+def check_shard_directory():
+    """Refuse to run with fewer shards than the directory points at.
+    
+    Users on a removed shard would have no bind to route to, so the shard count
+    can only grow; with SHARD_COUNT=1 no user may be on a shard file at all.
+    """
+    highest = db.session.query(sa.func.max(ShardAssignment.shard)).scalar()
+    if highest is not None and highest >= (SHARD_COUNT if SHARD_COUNT > 1 else 0):
+        raise ShardCountError(
+            f"shard_directory still assigns users to shard {highest}, but SHARD_COUNT is {SHARD_COUNT}; "
+            f"the shard count can only grow, set SHARD_COUNT to at least {max(highest + 1, 2)}"
+        )
+
+def init_database():
+    """Create the global tables and the user-scoped tables on every shard"""
+    db.create_all()
+    check_shard_directory()
+    if SHARD_COUNT > 1:
+        tables = [db.metadata.tables[name] for name in SHARDED_TABLES]
+        for engine in shard_engines():
+            db.metadata.create_all(engine, tables=tables)
+    for engine in shard_engines():
+        migrate_transaction_ids(engine)
+
+@app.before_request
+def select_shard():
+    """Route the logged-in user's queries to their shard"""
+    if SHARD_COUNT == 1 or 'user_id' not in session:
+        return None
+    assignment = db.session.get(ShardAssignment, session['user_id'])
+    if assignment and assignment.moving and request.method != 'GET':
+        return jsonify({'error': 'Your data is being moved, please retry shortly'}), 503, {'Retry-After': '1'}
+    g.shard_id = assignment.shard if assignment else LEGACY_SHARD
+
+# Online rebalancing
+def _user_columns(table_name):
+    """Columns copied when moving a user's rows; ids are reassigned by the target shard"""
+    return [column.name for column in db.metadata.tables[table_name].columns if column.name != 'id']
+
+def _copy_user_rows(source_file, target_file, user_id):
+    """Copy a user's hot and archived rows onto another shard, replacing any leftovers there.
+    
+    Archived rows take their new ids from the target shard's transaction counter,
+    so hot and archived ids stay in one id space there as well.
+    """
+    connection = sqlite3.connect(source_file, timeout=30, isolation_level=None)
+    try:
+        connection.execute("ATTACH DATABASE ? AS target", (target_file,))
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                for table in sorted(SHARDED_TABLES):
+                    columns = ', '.join(_user_columns(table))
+                    connection.execute(f"DELETE FROM target.{table} WHERE user_id = ?", (user_id,))
+                    if table == 'change_log':
+                        continue
+                    connection.execute(
+                        f"INSERT INTO target.{table} ({columns}) SELECT {columns} FROM main.{table} WHERE user_id = ?",
+                        (user_id,)
+                    )
+                # Ids change on the new shard, so sync clients must fetch everything again
+                connection.execute(
+                    "UPDATE target.data_versions SET version = version + 1, compacted_version = version + 1 "
+                    "WHERE user_id = ?", (user_id,)
+                )
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            
+            columns = TRANSACTION_COLUMNS[1:]
+            placeholders = ', '.join('?' * len(TRANSACTION_COLUMNS))
+            for year in archive_years(source_file):
+                connection.execute("ATTACH DATABASE ? AS source_archive", (archive_path(source_file, year),))
+                connection.execute("ATTACH DATABASE ? AS target_archive", (archive_path(target_file, year),))
+                try:
+                    connection.execute(ARCHIVE_TABLE_DDL.format(alias='target_archive'))
+                    connection.execute(ARCHIVE_INDEX_DDL.format(alias='target_archive'))
+                    connection.execute('BEGIN IMMEDIATE')
+                    try:
+                        connection.execute("DELETE FROM target_archive.transactions WHERE user_id = ?", (user_id,))
+                        rows = connection.execute(
+                            f"SELECT {', '.join(columns)} FROM source_archive.transactions WHERE user_id = ? ORDER BY id",
+                            (user_id,)
+                        ).fetchall()
+                        base = reserve_transaction_ids(connection, len(rows), 'target')
+                        connection.executemany(
+                            f"INSERT INTO target_archive.transactions ({', '.join(TRANSACTION_COLUMNS)}) "
+                            f"VALUES ({placeholders})",
+                            [(base + i + 1,) + tuple(row) for i, row in enumerate(rows)]
+                        )
+                        connection.execute('COMMIT')
+                    except Exception:
+                        connection.execute('ROLLBACK')
+                        raise
+                finally:
+                    connection.execute("DETACH DATABASE source_archive")
+                    connection.execute("DETACH DATABASE target_archive")
+        finally:
+            connection.execute("DETACH DATABASE target")
+    finally:
+        connection.close()
+
+def _delete_user_rows(db_file, user_id):
+    """Remove a user's hot and archived rows from a shard they no longer live on"""
+    connection = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    try:
+        connection.execute('BEGIN IMMEDIATE')
+        for table in sorted(SHARDED_TABLES):
+            connection.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+        connection.execute('COMMIT')
+        
+        for year in archive_years(db_file):
+            connection.execute("ATTACH DATABASE ? AS archive", (archive_path(db_file, year),))
+            try:
+                connection.execute("DELETE FROM archive.transactions WHERE user_id = ?", (user_id,))
+            finally:
+                connection.execute("DETACH DATABASE archive")
+    finally:
+        connection.close()
+
+def move_user_to_shard(user_id, target):
+    """Move one user's data to another shard while the app keeps serving.
+    
+    The user's writes are refused with 503 while the move is in progress; reads
+    keep hitting the old shard until the directory flips. Transaction and budget
+    ids are reassigned on the target shard, so the move forces a full /api/sync.
+    Users without a directory entry are moved out of the global database.
+    """
+    assignment = db.session.get(ShardAssignment, user_id)
+    if not assignment:
+        assignment = ShardAssignment(user_id=user_id, shard=LEGACY_SHARD)
+        db.session.add(assignment)
+    source = assignment.shard
+    if source == target:
+        db.session.commit()
+        return False
+    
+    assignment.moving = True
+    db.session.commit()
+    # Let writes that passed the moving check before the flag flipped finish
+    time.sleep(REBALANCE_GRACE_SECONDS)
+    
+    source_file = shard_engine(source).url.database
+    try:
+        _copy_user_rows(source_file, shard_engine(target).url.database, user_id)
+        assignment.shard = target
+    finally:
+        assignment.moving = False
+        db.session.commit()
+    
+    _delete_user_rows(source_file, user_id)
+    logger.info(f"Moved user {user_id} from shard {source} to shard {target}")
+    return True
+
+@app.cli.command('rebalance-shards')
+def rebalance_shards_command():
+    """Move every user whose shard differs from their hash shard (run after changing SHARD_COUNT)"""
+    if SHARD_COUNT == 1:
+        raise click.UsageError('Sharding is disabled; set SHARD_COUNT above 1 first')
+    init_database()
+    moved = 0
+    for user in User.query.all():
+        if move_user_to_shard(user.id, hash_shard(user.id)):
+            moved += 1
+    click.echo(f"Moved {moved} users")
+
+@app.cli.command('move-user')
+@click.argument('user_id', type=int)
+@click.argument('shard', type=int)
+def move_user_command(user_id, shard):
+    """Move one user's data to the given shard"""
+    if SHARD_COUNT == 1:
+        raise click.UsageError('Sharding is disabled; set SHARD_COUNT above 1 first')
+    init_database()
+    if not 0 <= shard < SHARD_COUNT:
+        raise click.BadParameter(f"shard must be between 0 and {SHARD_COUNT - 1}")
+    moved = move_user_to_shard(user_id, shard)
+    click.echo(f"User {user_id} {'moved to' if moved else 'already on'} shard {shard}")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -193,11 +1095,19 @@ def check_ollama_connection():
         logger.error(f"Error connecting to Ollama: {e}")
         return False
 
-def generate_response(prompt, context=""):
-    """Generate response using Ollama gemma:2b model"""
-    try:
-        # Enhance the prompt with financial context and formatting instructions
-        enhanced_prompt = f"""You are a helpful AI financial assistant. You help users manage their finances, analyze spending patterns, create budgets, and provide financial advice.
+# Financial context configuration
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '300'))
+CONTEXT_CACHE_SIZE = int(os.getenv('CONTEXT_CACHE_SIZE', '1024'))
+CHARS_PER_TOKEN = 4  # Rough estimate for gemma's tokenizer on English text and numbers
+
+# Chat session configuration
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')  # Keep the model (and its KV cache) loaded between turns
+CHAT_SESSION_IDLE_SECONDS = int(os.getenv('CHAT_SESSION_IDLE_SECONDS', '1800'))
+CHAT_SESSION_MAX_TOKENS = int(os.getenv('CHAT_SESSION_MAX_TOKENS', '1536'))  # Stay under gemma:2b's 2048-token window
+CHAT_SESSIONS_TOTAL_TOKENS = int(os.getenv('CHAT_SESSIONS_TOTAL_TOKENS', '2000000'))  # Memory cap across all sessions
+CHAT_SESSIONS_MAX = int(os.getenv('CHAT_SESSIONS_MAX', '10000'))
+
+SYSTEM_PROMPT = """You are a helpful AI financial assistant. You help users manage their finances, analyze spending patterns, create budgets, and provide financial advice.
 
 IMPORTANT FORMATTING RULES:
 - Use clear headings with ## or ### for main topics
@@ -206,24 +1116,129 @@ IMPORTANT FORMATTING RULES:
 - Use **bold text** for important concepts or warnings
 - Use "Key Point:" format for highlighting critical information
 - Break information into digestible paragraphs
-- When providing financial advice, structure it clearly with sections
+- When providing financial advice, structure it clearly with sections"""
+
+RESPONSE_INSTRUCTIONS = "Please provide a helpful, accurate, and well-structured response about personal finance management. Format your response with clear headings, bullet points, and organized sections for better readability."
+
+class ChatSessionStore:
+    """In-memory chat sessions holding the context tokens Ollama returns after each turn.
+    
+    A session belongs to the client that started it (see rate_limit_key) and is only
+    stored once a turn has produced context tokens. Sessions are evicted after
+    CHAT_SESSION_IDLE_SECONDS without use, and the least recently used ones are dropped
+    once there are more than CHAT_SESSIONS_MAX of them or they hold more than
+    CHAT_SESSIONS_TOTAL_TOKENS context tokens together.
+    """
+    
+    def __init__(self, idle_seconds, total_tokens, max_sessions):
+        self.idle_seconds = idle_seconds
+        self.total_tokens = total_tokens
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._tokens = 0
+        self._lock = threading.Lock()
+    
+    def get(self, session_id, owner):
+        """Return the owner's session and mark it as recently used, or None if unknown, expired or not theirs"""
+        with self._lock:
+            self._evict_idle()
+            chat_session = self._sessions.get(session_id)
+            if chat_session is None or chat_session['owner'] != owner:
+                return None
+            chat_session['last_used'] = time.time()
+            self._sessions.move_to_end(session_id)
+            return chat_session
+    
+    def save(self, session_id, owner, context, context_text):
+        """Store the context tokens returned by the latest turn, creating the session on its first turn"""
+        with self._lock:
+            self._evict_idle()
+            chat_session = self._sessions.get(session_id)
+            if chat_session is None:
+                chat_session = {'owner': owner, 'context': [], 'context_text': None, 'turns': 0}
+                self._sessions[session_id] = chat_session
+            elif chat_session['owner'] != owner:
+                return
+            self._tokens += len(context) - len(chat_session['context'])
+            chat_session.update(context=context, context_text=context_text,
+                                turns=chat_session['turns'] + 1, last_used=time.time())
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > 1 and (
+                    self._tokens > self.total_tokens or len(self._sessions) > self.max_sessions):
+                self._drop(next(iter(self._sessions)))
+    
+    def delete(self, session_id, owner):
+        """End the owner's session, returning whether it existed"""
+        with self._lock:
+            chat_session = self._sessions.get(session_id)
+            if chat_session is None or chat_session['owner'] != owner:
+                return False
+            return self._drop(session_id)
+    
+    def stats(self):
+        """Session count and total context tokens held, for the health endpoint"""
+        with self._lock:
+            self._evict_idle()
+            return {'sessions': len(self._sessions), 'context_tokens': self._tokens}
+    
+    def _drop(self, session_id):
+        chat_session = self._sessions.pop(session_id, None)
+        if chat_session is None:
+            return False
+        self._tokens -= len(chat_session['context'])
+        return True
+    
+    def _evict_idle(self):
+        cutoff = time.time() - self.idle_seconds
+        while self._sessions:
+            session_id, chat_session = next(iter(self._sessions.items()))
+            if chat_session['last_used'] >= cutoff:
+                break
+            self._drop(session_id)
+
+chat_sessions = ChatSessionStore(CHAT_SESSION_IDLE_SECONDS, CHAT_SESSIONS_TOTAL_TOKENS, CHAT_SESSIONS_MAX)
+
+def generate_response(prompt, context="", session_id=None, owner=None):
+    """Generate response using Ollama gemma:2b model.
+    
+    With a session_id, follow-up turns send only the new message together with the
+    context tokens from the previous turn, so the system prompt and earlier turns
+    are not re-encoded. The session is saved for its owner once a turn succeeds.
+    """
+    try:
+        chat_session = chat_sessions.get(session_id, owner) if session_id else None
+        
+        if chat_session and chat_session['context'] and len(chat_session['context']) < CHAT_SESSION_MAX_TOKENS:
+            # Only repeat the context when the client changed it since the last turn
+            if context and context != chat_session['context_text']:
+                turn_prompt = f"Context: {context}\n\nUser question: {prompt}"
+            else:
+                turn_prompt = f"User question: {prompt}"
+            conversation = chat_session['context']
+        else:
+            # Enhance the prompt with financial context and formatting instructions
+            turn_prompt = f"""{SYSTEM_PROMPT}
 
 Context: {context}
 
 User question: {prompt}
 
-Please provide a helpful, accurate, and well-structured response about personal finance management. Format your response with clear headings, bullet points, and organized sections for better readability."""
+{RESPONSE_INSTRUCTIONS}"""
+            conversation = None
 
         payload = {
             "model": MODEL_NAME,
-            "prompt": enhanced_prompt,
+            "prompt": turn_prompt,
             "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": 0.7,
                 "top_p": 0.9,
                 "max_tokens": 500
             }
         }
+        if conversation:
+            payload["context"] = conversation
 
         response = requests.post(
             f"{OLLAMA_BASE_URL}/api/generate",
@@ -233,6 +1248,14 @@ Please provide a helpful, accurate, and well-structured response about personal
 
         if response.status_code == 200:
             result = response.json()
+            logger.info(
+                f"Ollama turn: {result.get('prompt_eval_count', 0)} prompt tokens in "
+                f"{result.get('prompt_eval_duration', 0) / 1e6:.0f} ms"
+                + (" (continued session)" if conversation else "")
+            )
+            if session_id and result.get('context'):
+                chat_sessions.save(session_id, owner, result['context'],
+                                   context or (chat_session['context_text'] if chat_session else None))
             return result.get('response', 'Sorry, I could not generate a response.')
         else:
             logger.error(f"Ollama API error: {response.status_code} - {response.text}")
@@ -248,10 +1271,133 @@ Please provide a helpful, accurate, and well-structured response about personal
         logger.error(f"Unexpected error: {e}")
         return "Sorry, an unexpected error occurred."
 
+# Compact financial context for prompts
+financial_context_cache = OrderedDict()
+financial_context_lock = threading.Lock()
+
+def estimate_tokens(text):
+    """Approximate token count of a prompt fragment"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text, token_budget):
+    """Cut free-text context from clients down to the token budget"""
+    limit = token_budget * CHARS_PER_TOKEN
+    return text if len(text) <= limit else text[:limit].rstrip() + '...'
+
+def _month_start(day, months_back=0):
+    """First day (YYYY-MM-DD) of the month months_back before the given date"""
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}-01"
+
+def _period_line(label, rows):
+    totals = {'income': 0, 'expense': 0}
+    for type_, amount in rows:
+        totals[type_] = totals.get(type_, 0) + (amount or 0)
+    return (f"{label}: income {totals['income']:.2f}, expenses {totals['expense']:.2f}, "
+            f"net {totals['income'] - totals['expense']:.2f}")
+
+def _financial_context_sections(user_id):
+    """Context lines grouped by section, most important section first"""
+    user = db.session.get(User, user_id)
+    today = datetime.utcnow().date()
+    this_month, last_month = _month_start(today), _month_start(today, 1)
+    
+    def period_totals(start, end=None):
+        query = db.session.query(Transaction.type, db.func.sum(Transaction.amount)).filter(
+            Transaction.user_id == user_id, Transaction.date >= start
+        )
+        if end:
+            query = query.filter(Transaction.date < end)
+        return query.group_by(Transaction.type).order_by(Transaction.type).all()
+    
+    all_time = db.session.query(Transaction.type, db.func.sum(Transaction.amount)).filter(
+        Transaction.user_id == user_id
+    ).group_by(Transaction.type).all()
+    all_time += [('income', archived_total(user_id, 'income')), ('expense', archived_total(user_id, 'expense'))]
+    
+    totals = [
+        f"Currency: {user.currency if user else 'USD'}",
+        _period_line(f"This month ({this_month[:7]})", period_totals(this_month)),
+        _period_line(f"Last month ({last_month[:7]})", period_totals(last_month, this_month)),
+        _period_line("All time", all_time),
+    ]
+    
+    budgets = []
+    for budget in Budget.query.filter_by(user_id=user_id).order_by(Budget.name).all():
+        status = budget.to_dict()
+        line = f"- {budget.name}: spent {status['spent']:.2f} of {budget.budgetLimit:.2f} ({budget.period})"
+        if status['spent'] > budget.budgetLimit:
+            line += f", over by {status['spent'] - budget.budgetLimit:.2f}"
+        budgets.append(line)
+    
+    categories = db.session.query(Transaction.category, db.func.sum(Transaction.amount).label('total')).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == 'expense',
+        Transaction.date >= last_month
+    ).group_by(Transaction.category).order_by(db.desc('total'), Transaction.category).limit(5).all()
+    
+    notable = Transaction.query.filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= last_month
+    ).order_by(Transaction.amount.desc(), Transaction.id).limit(5).all()
+    
+    return [
+        ("Totals:", totals),
+        ("Budgets:", budgets),
+        ("Top expense categories since last month:", [f"- {name}: {total:.2f}" for name, total in categories]),
+        ("Largest transactions since last month:", [
+            f"- {t.date} {t.title[:40]} {'+' if t.type == 'income' else '-'}{t.amount:.2f} ({t.category})"
+            for t in notable
+        ]),
+    ]
+
+def build_financial_context(user_id, token_budget=None):
+    """Summarize a user's finances into a compact, deterministic block for LLM prompts.
+    
+    Sections are filled in priority order until the token budget is used up. The
+    result is cached per user data version and currency (and month, since periods
+    are calendar months), so repeated prompts reuse the identical text.
+    """
+    token_budget = token_budget or CONTEXT_TOKEN_BUDGET
+    # Settings changes do not bump the data version, so the currency is part of the key
+    user = db.session.get(User, user_id)
+    currency = user.currency if user else 'USD'
+    key = (user_id, get_data_version(user_id), currency, datetime.utcnow().strftime('%Y-%m'), token_budget)
+    with financial_context_lock:
+        if key in financial_context_cache:
+            financial_context_cache.move_to_end(key)
+            return financial_context_cache[key]
+    
+    lines = []
+    remaining = token_budget
+    for heading, section in _financial_context_sections(user_id):
+        block = [heading]
+        block_remaining = remaining - estimate_tokens(heading) - 1
+        for line in section:
+            cost = estimate_tokens(line) + 1
+            if cost > block_remaining:
+                break
+            block.append(line)
+            block_remaining -= cost
+        # Skip headings without any lines that fit
+        if len(block) > 1:
+            lines.extend(block)
+            remaining = block_remaining
+        if len(block) <= len(section):
+            break  # Budget used up
+    context = '\n'.join(lines)
+    
+    with financial_context_lock:
+        financial_context_cache[key] = context
+        while len(financial_context_cache) > CONTEXT_CACHE_SIZE:
+            financial_context_cache.popitem(last=False)
+    return context
+
 # Database API Endpoints
 
 # Authentication endpoints
 @app.route('/api/register', methods=['POST'])
+@rate_limited(CRUD_REQUEST_COST)
 def register():
     """Register a new user"""
     try:
@@ -276,6 +1422,11 @@ def register():
         db.session.add(user)
         db.session.commit()
         
+        # Pin the new user to a shard
+        if SHARD_COUNT > 1:
+            db.session.add(ShardAssignment(user_id=user.id, shard=hash_shard(user.id)))
+            db.session.commit()
+        
         # Log the user in
         session['user_id'] = user.id
         
@@ -290,6 +1441,7 @@ def register():
         return jsonify({'error': 'Registration failed'}), 500
 
 @app.route('/api/login', methods=['POST'])
+@rate_limited(CRUD_REQUEST_COST)
 def login():
     """Login user"""
     try:
@@ -391,17 +1543,33 @@ def update_settings():
 @app.route('/api/transactions', methods=['GET'])
 @login_required
 def get_transactions():
-    """Get all transactions for the current user"""
+    """Get transactions for the current user, optionally limited to a date range.
+    
+    Archived years are only read when the range reaches back into them; without
+    start_date every archived year is read.
+    """
     try:
         user_id = session['user_id']
-        transactions = Transaction.query.filter_by(user_id=user_id).all()
-        return jsonify([transaction.to_dict() for transaction in transactions])
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        query = Transaction.query.filter_by(user_id=user_id)
+        if start_date:
+            query = query.filter(Transaction.date >= start_date)
+        if end_date:
+            query = query.filter(Transaction.date <= end_date)
+        transactions = [transaction.to_dict() for transaction in query.all()]
+        
+        engine = db.session.get_bind(mapper=Transaction.__mapper__)
+        transactions.extend(fetch_archived_transactions(engine, user_id, start_date, end_date))
+        return jsonify(transactions)
     except Exception as e:
         logger.error(f"Error fetching transactions: {e}")
         return jsonify({'error': 'Failed to fetch transactions'}), 500
 
 @app.route('/api/transactions', methods=['POST'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def add_transaction():
     """Add a new transaction for the current user"""
     try:
@@ -423,7 +1591,25 @@ def add_transaction():
             notes=data.get('notes', '')
         )
         
+        if GROUP_COMMIT_ENABLED:
+            # Hand the row to the shard's writer and wait until its group is committed
+            transaction.created_at = datetime.utcnow()
+            values = {column: getattr(transaction, column) for column in TRANSACTION_COLUMNS[1:]}
+            engine = db.session.get_bind(mapper=Transaction.__mapper__)
+            future = group_commit_writer(engine).submit(Transaction, values)
+            try:
+                row = future.result(timeout=GROUP_COMMIT_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                # Still queued: withdraw the row so a retry cannot create a duplicate
+                if future.cancel():
+                    return jsonify({'error': 'Server is busy, transaction was not saved'}), 503, {'Retry-After': '1'}
+                # Its group is already being committed, so the outcome is only moments away
+                row = future.result()
+            return jsonify(Transaction(**row).to_dict()), 201
+        
         db.session.add(transaction)
+        db.session.flush()
+        record_change(user_id, 'transaction', transaction.id)
         db.session.commit()
         
         return jsonify(transaction.to_dict()), 201
@@ -432,8 +1618,16 @@ def add_transaction():
         logger.error(f"Error adding transaction: {e}")
         return jsonify({'error': 'Failed to add transaction'}), 500
 
+def transaction_not_found(user_id, transaction_id):
+    """Error response for a transaction missing from the hot table: 409 if it was archived, else 404"""
+    engine = db.session.get_bind(mapper=Transaction.__mapper__)
+    if fetch_archived_transactions(engine, user_id, ids=[transaction_id]):
+        return jsonify({'error': 'Archived transactions are read-only'}), 409
+    return jsonify({'error': 'Transaction not found'}), 404
+
 @app.route('/api/transactions/<int:transaction_id>', methods=['PUT'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def update_transaction(transaction_id):
     """Update a transaction for the current user"""
     try:
@@ -441,7 +1635,7 @@ def update_transaction(transaction_id):
         transaction = Transaction.query.filter_by(id=transaction_id, user_id=user_id).first()
         
         if not transaction:
-            return jsonify({'error': 'Transaction not found'}), 404
+            return transaction_not_found(user_id, transaction_id)
             
         data = request.get_json()
         
@@ -459,9 +1653,14 @@ def update_transaction(transaction_id):
         if 'notes' in data:
             transaction.notes = data['notes']
             
+        record_change(user_id, 'transaction', transaction.id)
         db.session.commit()
         
         return jsonify(transaction.to_dict())
+    except StaleDataError:
+        # The archiver moved the row after it was loaded, so the UPDATE matched nothing
+        db.session.rollback()
+        return transaction_not_found(user_id, transaction_id)
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating transaction: {e}")
@@ -469,16 +1668,17 @@ def update_transaction(transaction_id):
 
 @app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def delete_transaction(transaction_id):
     """Delete a transaction for the current user"""
     try:
         user_id = session['user_id']
-        transaction = Transaction.query.filter_by(id=transaction_id, user_id=user_id).first()
-        
-        if not transaction:
-            return jsonify({'error': 'Transaction not found'}), 404
+        # Check the DELETE's row count: the archiver may move the row at any time
+        if not Transaction.query.filter_by(id=transaction_id, user_id=user_id).delete():
+            db.session.rollback()
+            return transaction_not_found(user_id, transaction_id)
             
-        db.session.delete(transaction)
+        record_change(user_id, 'transaction', transaction_id, 'delete')
         db.session.commit()
         
         return jsonify({'message': 'Transaction deleted successfully'})
@@ -515,6 +1715,7 @@ def get_categories():
 
 @app.route('/api/budgets', methods=['POST'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def add_budget():
     """Add a new budget for the current user"""
     try:
@@ -543,6 +1744,8 @@ def add_budget():
         )
         
         db.session.add(budget)
+        db.session.flush()
+        record_change(user_id, 'budget', budget.id)
         db.session.commit()
         
         return jsonify(budget.to_dict()), 201
@@ -553,6 +1756,7 @@ def add_budget():
 
 @app.route('/api/budgets/<int:budget_id>', methods=['PUT'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def update_budget(budget_id):
     """Update a budget for the current user"""
     try:
@@ -581,6 +1785,7 @@ def update_budget(budget_id):
         if 'period' in data:
             budget.period = data['period']
             
+        record_change(user_id, 'budget', budget.id)
         db.session.commit()
         
         return jsonify(budget.to_dict())
@@ -591,6 +1796,7 @@ def update_budget(budget_id):
 
 @app.route('/api/budgets/<int:budget_id>', methods=['DELETE'])
 @login_required
+@rate_limited(CRUD_REQUEST_COST)
 def delete_budget(budget_id):
     """Delete a budget for the current user"""
     try:
@@ -601,6 +1807,7 @@ def delete_budget(budget_id):
             return jsonify({'error': 'Budget not found'}), 404
             
         db.session.delete(budget)
+        record_change(user_id, 'budget', budget_id, 'delete')
         db.session.commit()
         
         return jsonify({'message': 'Budget deleted successfully'})
@@ -609,6 +1816,76 @@ def delete_budget(budget_id):
         logger.error(f"Error deleting budget: {e}")
         return jsonify({'error': 'Failed to delete budget'}), 500
 
+@app.route('/api/sync', methods=['GET'])
+@login_required
+def sync():
+    """Get the transactions and budgets changed since the client's version.
+    
+    Without a usable since version (missing, or older than the compacted part of
+    the change log) the full data set is returned with full=true, limited to
+    transactions on or after start_date if given.
+    """
+    try:
+        user_id = session['user_id']
+        since = request.args.get('since', type=int) or 0
+        start_date = request.args.get('start_date')
+        data_version = db.session.get(DataVersion, user_id)
+        version = data_version.version if data_version else 0
+        compacted_version = data_version.compacted_version if data_version else 0
+        
+        if since <= 0 or since < compacted_version or since > version:
+            engine = db.session.get_bind(mapper=Transaction.__mapper__)
+            query = Transaction.query.filter_by(user_id=user_id)
+            if start_date:
+                query = query.filter(Transaction.date >= start_date)
+            transactions = [t.to_dict() for t in query.all()]
+            transactions.extend(fetch_archived_transactions(engine, user_id, start_date))
+            return jsonify({
+                'version': version,
+                'full': True,
+                'transactions': transactions,
+                'budgets': [budget.to_dict() for budget in Budget.query.filter_by(user_id=user_id).all()],
+                'deleted': {'transactions': [], 'budgets': []}
+            })
+        
+        # Keep only the latest change per row
+        latest = {}
+        for change in ChangeLog.query.filter(
+            ChangeLog.user_id == user_id, ChangeLog.version > since
+        ).order_by(ChangeLog.version).all():
+            latest[(change.entity, change.entity_id)] = change.op
+        
+        changed = {'transaction': [], 'budget': []}
+        deleted = {'transaction': [], 'budget': []}
+        for (entity, entity_id), op in sorted(latest.items()):
+            (deleted if op == 'delete' else changed)[entity].append(entity_id)
+        
+        transactions = [transaction.to_dict() for transaction in Transaction.query.filter(
+            Transaction.user_id == user_id, Transaction.id.in_(changed['transaction'])
+        ).all()] if changed['transaction'] else []
+        # Rows changed and then archived are no longer in the hot table; the archiver only moves
+        # rows out of it, so anything missed here is already in an archive when looked up next
+        missing = set(changed['transaction']) - {transaction['id'] for transaction in transactions}
+        if missing:
+            engine = db.session.get_bind(mapper=Transaction.__mapper__)
+            transactions.extend(fetch_archived_transactions(engine, user_id, ids=sorted(missing)))
+            missing -= {transaction['id'] for transaction in transactions}
+            # Gone from both places: tell the client to drop it
+            deleted['transaction'] = sorted(set(deleted['transaction']) | missing)
+        # Spent/remaining on every budget depend on the transactions, so resend them all on any change
+        budgets = Budget.query.filter_by(user_id=user_id).all() if latest else []
+        
+        return jsonify({
+            'version': version,
+            'full': False,
+            'transactions': transactions,
+            'budgets': [budget.to_dict() for budget in budgets],
+            'deleted': {'transactions': deleted['transaction'], 'budgets': deleted['budget']}
+        })
+    except Exception as e:
+        logger.error(f"Error syncing changes: {e}")
+        return jsonify({'error': 'Failed to sync changes'}), 500
+
 @app.route('/api/dashboard-stats', methods=['GET'])
 @login_required
 def get_dashboard_stats():
@@ -621,12 +1898,14 @@ def get_dashboard_stats():
             Transaction.user_id == user_id,
             Transaction.type == 'income'
         ).scalar() or 0
+        total_income += archived_total(user_id, 'income')
         
         # Calculate total expenses
         total_expenses = db.session.query(db.func.sum(Transaction.amount)).filter(
             Transaction.user_id == user_id,
             Transaction.type == 'expense'
         ).scalar() or 0
+        total_expenses += archived_total(user_id, 'expense')
         
         # Calculate total budget limits
         total_budget = db.session.query(db.func.sum(Budget.budgetLimit)).filter(
@@ -638,6 +1917,7 @@ def get_dashboard_stats():
         
         # Count transactions
         transaction_count = Transaction.query.filter_by(user_id=user_id).count()
+        transaction_count += archived_total(user_id, column='count')
         
         # Count budgets
         budget_count = Budget.query.filter_by(user_id=user_id).count()
@@ -663,6 +1943,15 @@ def get_dashboard_stats():
         logger.error(f"Error fetching dashboard stats: {e}")
         return jsonify({'error': 'Failed to fetch dashboard stats'}), 500
 
+@app.route('/api/usage', methods=['GET'])
+@login_required
+def get_usage():
+    """Get the current user's rate limit usage counters"""
+    usage = rate_limiter.usage(rate_limit_key())
+    usage.update(tokens=round(usage['tokens'], 2), capacity=RATE_LIMIT_CAPACITY,
+                 refill_per_second=RATE_LIMIT_REFILL_PER_SECOND)
+    return jsonify(usage)
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -670,10 +1959,12 @@ def health_check():
     return jsonify({
         'status': 'healthy' if ollama_status else 'degraded',
         'ollama_available': ollama_status,
-        'model': MODEL_NAME
+        'model': MODEL_NAME,
+        'chat_sessions': chat_sessions.stats()
     })
 
 @app.route('/api/chat', methods=['POST'])
+@rate_limited(LLM_REQUEST_COST)
 def chat():
     """Chat endpoint for AI conversations"""
     try:
@@ -683,7 +1974,9 @@ def chat():
             return jsonify({'error': 'Message is required'}), 400
         
         user_message = data['message']
-        context = data.get('context', '')
+        context = truncate_to_tokens(data.get('context') or '', CONTEXT_TOKEN_BUDGET)
+        if 'user_id' in session:
+            context = '\n'.join(filter(None, [build_financial_context(session['user_id']), context]))
         
         # Check if Ollama is available
         if not check_ollama_connection():
@@ -692,11 +1985,19 @@ def chat():
                 'error': 'Ollama service unavailable'
             }), 503
         
+        # Unknown, expired or someone else's session ids start a fresh session
+        owner = rate_limit_key()
+        session_id = data.get('session_id')
+        if not session_id or chat_sessions.get(session_id, owner) is None:
+            session_id = secrets.token_urlsafe(16)
+        
         # Generate response
-        ai_response = generate_response(user_message, context)
+        ai_response = generate_response(user_message, context, session_id, owner)
         
         return jsonify({
             'response': ai_response,
+            # Only sessions saved by a successful turn are returned to the client
+            'session_id': session_id if chat_sessions.get(session_id, owner) is not None else None,
             'model': MODEL_NAME,
             'timestamp': json.dumps({"$date": {"$numberLong": str(int(request.environ.get('time', 0) * 1000))}})
         })
@@ -705,7 +2006,15 @@ def chat():
         logger.error(f"Error in chat endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/chat/sessions/<session_id>', methods=['DELETE'])
+def end_chat_session(session_id):
+    """End a chat session and free its context"""
+    if not chat_sessions.delete(session_id, rate_limit_key()):
+        return jsonify({'error': 'Chat session not found'}), 404
+    return jsonify({'message': 'Chat session ended'})
+
 @app.route('/api/financial-analysis', methods=['POST'])
+@rate_limited(LLM_REQUEST_COST)
 def financial_analysis():
     """Endpoint for financial data analysis"""
     try:
@@ -719,8 +2028,11 @@ def financial_analysis():
         income = data.get('income', 0)
         expenses = data.get('expenses', 0)
         
-        # Create context for financial analysis
-        context = f"""
+        # Create context for financial analysis, from the database when the user is logged in
+        if 'user_id' in session:
+            context = build_financial_context(session['user_id'])
+        else:
+            context = f"""
         Financial Summary:
         - Monthly Income: ${income}
         - Monthly Expenses: ${expenses}
@@ -761,7 +2073,7 @@ if __name__ == '__main__':
             logger.info("Database connection successful!")
             
             # Create tables
-            db.create_all()
+            init_database()
             logger.info("Database tables created successfully!")
             
             # Add some sample data if tables are empty
@@ -775,6 +2087,11 @@ if __name__ == '__main__':
                 db.session.add(sample_user)
                 db.session.commit()
                 
+                if SHARD_COUNT > 1:
+                    db.session.add(ShardAssignment(user_id=sample_user.id, shard=hash_shard(sample_user.id)))
+                    db.session.commit()
+                g.shard_id = shard_for_user(sample_user.id)
+                
                 # Add sample transactions for the demo user
                 sample_transactions = [
                     Transaction(user_id=sample_user.id, date='2024-01-15', title='Grocery Shopping', type='expense', amount=125.50, category='Groceries', notes='Weekly groceries'),
@@ -797,6 +2114,8 @@ if __name__ == '__main__':
                 logger.info("Sample user and data added to database!")
                 logger.info("Demo login: demo@example.com / demo123")
                 
+        except ShardCountError:
+            raise
         except Exception as e:
             logger.error(f"Database initialization error: {e}")
             logger.info("Continuing without database - some features may not work")
@@ -0,0 +1,166 @@
+"""Benchmark transaction write throughput against the number of SQLite shards.
+
+For each shard count the backend is started fresh in a set of writer
+processes (so the GIL is not the bottleneck). Every writer process runs one
+or more threads, each registering its own user and POSTing transactions
+through the Flask test client, so each insert goes through the same routing
+and commit path as a real request. With --group-commit the threads of a
+process share its group-commit writer.
+
+With --storage the request layer is skipped: each writer process inserts
+straight into the shard file the app routes its user to, one
+synchronous=FULL commit per row. That isolates the fsync and write-lock cost
+sharding is meant to spread, instead of the CPU cost of Flask. Use --dir to
+put the databases on the disk you want to measure.
+
+Usage:
+    python benchmark_shards.py --shards 1 2 4 8 --writers 16 --inserts 200
+    python benchmark_shards.py --shards 1 2 4 8 --writers 16 --inserts 100 --storage --dir .
+    python benchmark_shards.py --shards 1 --writers 1 --threads 32 --group-commit
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+def write_transactions(index, threads, inserts, barrier, results):
+    """Writer process: register one user per thread, wait for the others, then insert"""
+    import app as backend
+
+    clients = []
+    for thread_index in range(threads):
+        client = backend.app.test_client()
+        client.post('/api/register', json={
+            'full_name': f'Bench User {index}-{thread_index}',
+            'email': f'bench{index}-{thread_index}@example.com',
+            'password': 'bench',
+        })
+        clients.append(client)
+
+    errors = []
+
+    def insert(client):
+        for n in range(inserts):
+            response = client.post('/api/transactions', json={
+                'date': '2024-01-01',
+                'title': f'Bench {n}',
+                'type': 'expense',
+                'amount': 1.0,
+                'category': 'Bench',
+            })
+            if response.status_code != 201:
+                errors.append(response.status_code)
+
+    workers = [threading.Thread(target=insert, args=(client,)) for client in clients]
+    barrier.wait()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(len(errors))
+
+
+def write_rows(index, threads, inserts, barrier, results):
+    """Storage-only writer process: commit rows directly into each user's shard file"""
+    import app as backend
+
+    targets = []
+    with backend.app.app_context():
+        for thread_index in range(threads):
+            user_id = index * threads + thread_index + 1
+            targets.append((user_id, backend.shard_engine(backend.hash_shard(user_id)).url.database))
+
+    errors = []
+
+    def insert(user_id, path):
+        connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        connection.execute('PRAGMA synchronous=FULL')
+        for n in range(inserts):
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    "INSERT INTO transactions (user_id, date, title, type, amount, category) "
+                    "VALUES (?, '2024-01-01', ?, 'expense', 1.0, 'Bench')",
+                    (user_id, f'Bench {n}')
+                )
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                errors.append(n)
+        connection.close()
+
+    workers = [threading.Thread(target=insert, args=target) for target in targets]
+    barrier.wait()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(len(errors))
+
+
+def _init_database():
+    import app as backend
+
+    with backend.app.app_context():
+        backend.init_database()
+
+
+def run(shard_count, writers, threads, inserts, group_commit=False, storage=False, base_dir=None):
+    """Return (rows written, errors, seconds) for one shard count"""
+    # Absolute path: Flask-SQLAlchemy resolves relative SQLite paths against the instance folder
+    base_dir = os.path.abspath(base_dir) if base_dir else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as directory:
+        os.environ['SHARD_COUNT'] = str(shard_count)
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        # Measure storage throughput, not the request rate limiter
+        os.environ['RATE_LIMIT_ENABLED'] = 'false'
+        os.environ['GROUP_COMMIT_ENABLED'] = 'true' if group_commit else 'false'
+
+        context = multiprocessing.get_context('spawn')
+        # Create the schema once before the writers race to do it
+        setup = context.Process(target=_init_database)
+        setup.start()
+        setup.join()
+
+        barrier = context.Barrier(writers + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=write_rows if storage else write_transactions,
+                            args=(i, threads, inserts, barrier, results))
+            for i in range(writers)
+        ]
+        for process in processes:
+            process.start()
+
+        barrier.wait()
+        start = time.perf_counter()
+        errors = sum(results.get() for _ in processes)
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+        return writers * threads * inserts - errors, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--threads', type=int, default=1, help='writer threads (users) per process')
+    parser.add_argument('--inserts', type=int, default=200)
+    parser.add_argument('--group-commit', action='store_true', help='enable GROUP_COMMIT_ENABLED')
+    parser.add_argument('--storage', action='store_true', help='insert directly into the shard files, bypassing Flask')
+    parser.add_argument('--dir', default=None, help='directory for the benchmark databases (default: system temp)')
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} {'rows':>8} {'errors':>6} {'seconds':>8} {'rows/s':>10}")
+    for shard_count in args.shards:
+        rows, errors, seconds = run(shard_count, args.writers, args.threads, args.inserts,
+                                    args.group_commit, args.storage, args.dir)
+        print(f"{shard_count:>6} {rows:>8} {errors:>6} {seconds:>8.2f} {rows / seconds:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
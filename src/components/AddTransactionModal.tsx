@@ -28,6 +28,7 @@ export interface Transaction {
   amount: number;
   category: string;
   notes?: string;
+  archived?: boolean;
 }
 
 interface Category {
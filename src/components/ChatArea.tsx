@@ -45,17 +45,21 @@ I'm powered by gemma:2b AI and I'm here to help you with:
   ]);
   const [inputMessage, setInputMessage] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  // Server-side chat session, so follow-up turns reuse the model's context
+  const [sessionId, setSessionId] = useState<string | null>(null);
 
   const callBackendAPI = async (message: string): Promise<string> => {
     try {
       const response = await fetch(`${BACKEND_URL}/api/chat`, {
         method: 'POST',
+        credentials: 'include', // Send the session cookie so the backend can use the user's own data
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
           message: message,
-          context: 'User is using a personal finance management application'
+          context: 'User is using a personal finance management application',
+          session_id: sessionId,
         }),
       });
 
@@ -64,6 +68,9 @@ I'm powered by gemma:2b AI and I'm here to help you with:
       }
 
       const data = await response.json();
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
       return data.response || 'Sorry, I could not process your request.';
     } catch (error) {
       console.error('Error calling backend API:', error);
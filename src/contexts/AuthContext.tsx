@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import { authAPI } from '@/lib/api';
+import { syncStore } from '@/store/syncStore';
 
 interface User {
   id: number;
@@ -64,6 +65,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const login = async (email: string, password: string) => {
     try {
       const response = await authAPI.login({ email, password });
+      syncStore.reset();
       setUser(response.user);
     } catch (error) {
       throw error;
@@ -77,6 +79,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
         email,
         password,
       });
+      syncStore.reset();
       setUser(response.user);
     } catch (error) {
       throw error;
@@ -86,9 +89,11 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const logout = async () => {
     try {
       await authAPI.logout();
+      syncStore.reset();
       setUser(null);
     } catch (error) {
       // Even if logout fails on server, clear local state
+      syncStore.reset();
       setUser(null);
       throw error;
     }
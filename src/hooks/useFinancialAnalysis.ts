@@ -30,6 +30,7 @@ export const useFinancialAnalysis = () => {
     try {
       const response = await fetch(`${BACKEND_URL}/api/financial-analysis`, {
         method: 'POST',
+        credentials: 'include', // Send the session cookie so the backend can use the user's own data
         headers: {
           'Content-Type': 'application/json',
         },
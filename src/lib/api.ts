@@ -84,8 +84,15 @@ export const authAPI = {
 
 // Transaction API functions
 export const transactionAPI = {
-  // Get all transactions
-  getAll: () => apiRequest('/transactions'),
+  // Get transactions, optionally limited to a date range (YYYY-MM-DD, both inclusive).
+  // Without a range every archived year is read as well.
+  getAll: (range: { startDate?: string; endDate?: string } = {}) => {
+    const params = new URLSearchParams();
+    if (range.startDate) params.set('start_date', range.startDate);
+    if (range.endDate) params.set('end_date', range.endDate);
+    const query = params.toString();
+    return apiRequest(query ? `/transactions?${query}` : '/transactions');
+  },
 
   // Add a new transaction
   create: (transaction: {
@@ -161,13 +168,32 @@ export const dashboardAPI = {
   getStats: () => apiRequest('/dashboard-stats'),
 };
 
+// Sync API functions
+export const syncAPI = {
+  // Get transactions/budgets changed since a version (omit it for everything).
+  // When the response has full: true, replace local data instead of merging it;
+  // startDate limits a full response to transactions on or after that date.
+  changesSince: (version?: number, startDate?: string) => {
+    const params = new URLSearchParams();
+    if (version) params.set('since', String(version));
+    if (startDate) params.set('start_date', startDate);
+    const query = params.toString();
+    return apiRequest(query ? `/sync?${query}` : '/sync');
+  },
+};
+
 // Chat API function (existing)
 export const chatAPI = {
-  sendMessage: (message: string, context?: string) => 
+  sendMessage: (message: string, context?: string, sessionId?: string) => 
     apiRequest('/chat', {
       method: 'POST',
-      body: JSON.stringify({ message, context }),
+      body: JSON.stringify({ message, context, session_id: sessionId }),
     }),
+
+  // End a chat session and free its server-side context
+  endSession: (sessionId: string) => apiRequest(`/chat/sessions/${sessionId}`, {
+    method: 'DELETE',
+  }),
 };
 
 // Financial Analysis API function (existing)
@@ -9,6 +9,7 @@ import { Progress } from "@/components/ui/progress";
 import { Badge } from "@/components/ui/badge";
 import { Plus, AlertTriangle, TrendingUp, Trash2, Edit } from "lucide-react";
 import { budgetAPI } from "@/lib/api";
+import { syncStore } from "@/store/syncStore";
 
 interface Budget {
   id: number;
@@ -23,7 +24,7 @@ interface Budget {
 }
 
 const Budgets = () => {
-  const [budgets, setBudgets] = useState<Budget[]>([]);
+  const [budgets, setBudgets] = useState<Budget[]>(syncStore.getBudgets());
   const [isAddModalOpen, setIsAddModalOpen] = useState(false);
   const [isEditModalOpen, setIsEditModalOpen] = useState(false);
   const [editingBudget, setEditingBudget] = useState<Budget | null>(null);
@@ -32,14 +33,20 @@ const Budgets = () => {
 
   useEffect(() => {
     fetchBudgets();
+
+    const unsubscribe = syncStore.subscribe(() => {
+      setBudgets(syncStore.getBudgets());
+    });
+
+    return unsubscribe;
   }, []);
 
   const fetchBudgets = async () => {
     try {
       setIsLoading(true);
       setError(null);
-      const data = await budgetAPI.getAll();
-      setBudgets(data);
+      // Only changes since the last sync are fetched once the store holds data
+      await syncStore.refresh();
     } catch (error) {
       console.error("Failed to fetch budgets:", error);
       setError("Failed to load budgets. Please make sure the backend server is running.");
@@ -62,7 +69,7 @@ const Budgets = () => {
   const handleAddCategory = async (categoryData: { name: string; budgetLimit: number; color: string }) => {
     try {
       await budgetAPI.create(categoryData);
-      await fetchBudgets(); // Refresh the list
+      await syncStore.refresh(); // Fetch only the changes
       setIsAddModalOpen(false);
     } catch (error) {
       console.error("Failed to add budget:", error);
@@ -80,7 +87,7 @@ const Budgets = () => {
     
     try {
       await budgetAPI.update(editingBudget.id, categoryData);
-      await fetchBudgets(); // Refresh the list
+      await syncStore.refresh(); // Fetch only the changes
       setIsEditModalOpen(false);
       setEditingBudget(null);
     } catch (error) {
@@ -96,7 +103,7 @@ const Budgets = () => {
 
     try {
       await budgetAPI.delete(id);
-      await fetchBudgets(); // Refresh the list
+      await syncStore.refresh(); // Fetch only the changes
     } catch (error) {
       console.error("Failed to delete budget:", error);
       alert("Failed to delete budget. Please try again.");
@@ -8,6 +8,7 @@ import { ChartContainer, ChartTooltip, ChartTooltipContent, ChartLegend, ChartLe
 import { PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Legend } from "recharts";
 import { TrendingUp, TrendingDown, DollarSign, Plus, Bot, BarChart3 } from "lucide-react";
 import { categoryStore } from "@/store/categoryStore";
+import { syncStore } from "@/store/syncStore";
 import { useFinancialAnalysis } from "@/hooks/useFinancialAnalysis";
 import { dashboardAPI, transactionAPI } from "@/lib/api";
 import { AddTransactionModal, Transaction } from "@/components/AddTransactionModal";
@@ -45,6 +46,7 @@ const Dashboard = () => {
   useEffect(() => {
     try {
       fetchDashboardStats();
+      syncCategories();
       setCategoryData(categoryStore.getCategoryData() || []);
       
       const unsubscribe = categoryStore.subscribe(() => {
@@ -57,6 +59,15 @@ const Dashboard = () => {
     }
   }, []);
 
+  // Budgets reach the category store through the sync store
+  const syncCategories = async () => {
+    try {
+      await syncStore.refresh();
+    } catch (error) {
+      console.error('Failed to sync budgets:', error);
+    }
+  };
+
   const fetchDashboardStats = async () => {
     try {
       console.log('Fetching dashboard stats...');
@@ -101,7 +112,7 @@ const Dashboard = () => {
       await transactionAPI.create(transaction);
       setIsTransactionModalOpen(false);
       // Refresh dashboard stats after adding transaction
-      await fetchDashboardStats();
+      await Promise.all([fetchDashboardStats(), syncCategories()]);
       console.log('Transaction saved successfully');
     } catch (error) {
       console.error('Failed to save transaction:', error);
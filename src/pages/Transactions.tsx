@@ -42,6 +42,7 @@ import {
   AlertDialogTrigger,
 } from "@/components/ui/alert-dialog";
 import { transactionAPI } from "@/lib/api";
+import { syncStore, RECENT_MONTHS } from "@/store/syncStore";
 
 // Dummy transaction data
 const initialTransactions: Transaction[] = [
@@ -102,7 +103,8 @@ const initialTransactions: Transaction[] = [
 ];
 
 const Transactions = () => {
-  const [transactions, setTransactions] = useState<Transaction[]>([]);
+  const [transactions, setTransactions] = useState<Transaction[]>(syncStore.getTransactions());
+  const [startDate, setStartDate] = useState<string | null>(syncStore.getStartDate());
   const [searchTerm, setSearchTerm] = useState("");
   const [selectedType, setSelectedType] = useState("all");
   const [transactionToEdit, setTransactionToEdit] = useState<Transaction | null>(null);
@@ -112,14 +114,21 @@ const Transactions = () => {
 
   useEffect(() => {
     fetchTransactions();
+
+    const unsubscribe = syncStore.subscribe(() => {
+      setTransactions(syncStore.getTransactions());
+      setStartDate(syncStore.getStartDate());
+    });
+
+    return unsubscribe;
   }, []);
 
-  const fetchTransactions = async () => {
+  const fetchTransactions = async (loadOlder = false) => {
     try {
       setIsLoading(true);
       setError(null);
-      const data = await transactionAPI.getAll();
-      setTransactions(data);
+      // Only changes since the last sync are fetched once the store holds data
+      await (loadOlder ? syncStore.loadOlder() : syncStore.refresh());
     } catch (error) {
       console.error("Failed to fetch transactions:", error);
       setError("Failed to load transactions. Please make sure the backend server is running.");
@@ -154,7 +163,7 @@ const Transactions = () => {
         // Add new transaction
         await transactionAPI.create(transactionData);
       }
-      await fetchTransactions(); // Refresh the list
+      await syncStore.refresh(); // Fetch only the changed rows
       setTransactionToEdit(null);
       setIsModalOpen(false);
     } catch (error) {
@@ -185,7 +194,7 @@ const Transactions = () => {
 
     try {
       await transactionAPI.delete(transactionId);
-      await fetchTransactions(); // Refresh the list
+      await syncStore.refresh(); // Fetch only the changed rows
     } catch (error) {
       console.error("Failed to delete transaction:", error);
       alert("Failed to delete transaction. Please try again.");
@@ -212,7 +221,7 @@ const Transactions = () => {
           <div className="text-center">
             <AlertTriangle className="h-8 w-8 text-red-500 mx-auto mb-4" />
             <p className="text-muted-foreground">{error}</p>
-            <Button onClick={fetchTransactions} className="mt-4">
+            <Button onClick={() => fetchTransactions()} className="mt-4">
               Try Again
             </Button>
           </div>
@@ -296,7 +305,9 @@ const Transactions = () => {
             <CardHeader>
               <CardTitle>Recent Transactions</CardTitle>
               <CardDescription>
-                A list of your recent financial activities
+                {startDate
+                  ? `Your financial activities of the last ${RECENT_MONTHS} months`
+                  : "All of your financial activities"}
               </CardDescription>
             </CardHeader>
             <CardContent>
@@ -370,66 +381,87 @@ const Transactions = () => {
                           </span>
                         </TableCell>
                         <TableCell>
-                          <DropdownMenu>
-                            <DropdownMenuTrigger asChild>
-                              <Button
-                                variant="ghost"
-                                size="sm"
-                                className="h-8 w-8 p-0 hover:bg-accent"
-                              >
-                                <MoreHorizontal className="h-4 w-4" />
-                              </Button>
-                            </DropdownMenuTrigger>
-                            <DropdownMenuContent align="end">
-                              <DropdownMenuItem
-                                onClick={() =>
-                                  handleEditTransaction(transaction)
-                                }
-                              >
-                                Edit
-                              </DropdownMenuItem>
-                              <AlertDialog>
-                                <AlertDialogTrigger asChild>
-                                  <DropdownMenuItem
-                                    onSelect={(e) => e.preventDefault()}
-                                  >
-                                    Delete
-                                  </DropdownMenuItem>
-                                </AlertDialogTrigger>
-                                <AlertDialogContent>
-                                  <AlertDialogHeader>
-                                    <AlertDialogTitle>
-                                      Are you sure?
-                                    </AlertDialogTitle>
-                                    <AlertDialogDescription>
-                                      This action cannot be undone. This will
-                                      permanently delete the transaction.
-                                    </AlertDialogDescription>
-                                  </AlertDialogHeader>
-                                  <AlertDialogFooter>
-                                    <AlertDialogCancel>
-                                      Cancel
-                                    </AlertDialogCancel>
-                                    <AlertDialogAction
-                                      onClick={() =>
-                                        handleDeleteTransaction(
-                                          transaction.id as number,
-                                        )
-                                      }
+                          {transaction.archived ? (
+                            <Badge
+                              variant="outline"
+                              className="text-muted-foreground"
+                              title="Archived transactions are read-only"
+                            >
+                              Archived
+                            </Badge>
+                          ) : (
+                            <DropdownMenu>
+                              <DropdownMenuTrigger asChild>
+                                <Button
+                                  variant="ghost"
+                                  size="sm"
+                                  className="h-8 w-8 p-0 hover:bg-accent"
+                                >
+                                  <MoreHorizontal className="h-4 w-4" />
+                                </Button>
+                              </DropdownMenuTrigger>
+                              <DropdownMenuContent align="end">
+                                <DropdownMenuItem
+                                  onClick={() =>
+                                    handleEditTransaction(transaction)
+                                  }
+                                >
+                                  Edit
+                                </DropdownMenuItem>
+                                <AlertDialog>
+                                  <AlertDialogTrigger asChild>
+                                    <DropdownMenuItem
+                                      onSelect={(e) => e.preventDefault()}
                                     >
-                                      Continue
-                                    </AlertDialogAction>
-                                  </AlertDialogFooter>
-                                </AlertDialogContent>
-                              </AlertDialog>
-                            </DropdownMenuContent>
-                          </DropdownMenu>
+                                      Delete
+                                    </DropdownMenuItem>
+                                  </AlertDialogTrigger>
+                                  <AlertDialogContent>
+                                    <AlertDialogHeader>
+                                      <AlertDialogTitle>
+                                        Are you sure?
+                                      </AlertDialogTitle>
+                                      <AlertDialogDescription>
+                                        This action cannot be undone. This will
+                                        permanently delete the transaction.
+                                      </AlertDialogDescription>
+                                    </AlertDialogHeader>
+                                    <AlertDialogFooter>
+                                      <AlertDialogCancel>
+                                        Cancel
+                                      </AlertDialogCancel>
+                                      <AlertDialogAction
+                                        onClick={() =>
+                                          handleDeleteTransaction(
+                                            transaction.id as number,
+                                          )
+                                        }
+                                      >
+                                        Continue
+                                      </AlertDialogAction>
+                                    </AlertDialogFooter>
+                                  </AlertDialogContent>
+                                </AlertDialog>
+                              </DropdownMenuContent>
+                            </DropdownMenu>
+                          )}
                         </TableCell>
                       </motion.tr>
                     ))}
                   </TableBody>
                 </Table>
               </div>
+              {startDate && (
+                <div className="flex justify-center mt-4">
+                  <Button
+                    variant="outline"
+                    className="btn-secondary"
+                    onClick={() => fetchTransactions(true)}
+                  >
+                    Load older transactions
+                  </Button>
+                </div>
+              )}
             </CardContent>
           </Card>
         </motion.div>
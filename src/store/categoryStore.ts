@@ -67,6 +67,12 @@ class CategoryStore {
     return this.categories;
   }
 
+  // Replace the categories with the user's budgets from the server
+  setCategories(categories: Category[]) {
+    this.categories = categories;
+    this.notifyListeners();
+  }
+
   addCategory(categoryData: { name: string; budgetLimit: number; color: string }) {
     const newCategory: Category = {
       id: Math.max(...this.categories.map(c => c.id), 0) + 1,
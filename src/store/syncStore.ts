@@ -0,0 +1,109 @@
+import { syncAPI } from "@/lib/api";
+import { categoryStore, Category } from "./categoryStore";
+
+interface SyncedTransaction {
+  id: number;
+  date: string;
+  title: string;
+  type: "income" | "expense";
+  amount: number;
+  category: string;
+  notes?: string;
+  archived?: boolean;
+}
+
+interface SyncedBudget extends Category {
+  income: number;
+  remaining: number;
+  created_at?: string;
+}
+
+// Only recent transactions are loaded by default, so archived years are not read on every visit
+const RECENT_MONTHS = 12;
+
+const recentStartDate = () => {
+  const date = new Date();
+  date.setMonth(date.getMonth() - RECENT_MONTHS);
+  return date.toISOString().slice(0, 10);
+};
+
+// Local copy of the user's transactions and budgets, kept current through /api/sync:
+// the first call loads everything, later calls only fetch what changed since then
+class SyncStore {
+  private transactions: SyncedTransaction[] = [];
+  private budgets: SyncedBudget[] = [];
+  private version: number | null = null;
+  private startDate: string | null = recentStartDate();
+
+  private listeners: (() => void)[] = [];
+
+  getTransactions(): SyncedTransaction[] {
+    return this.transactions;
+  }
+
+  getBudgets(): SyncedBudget[] {
+    return this.budgets;
+  }
+
+  // First date of the loaded transactions, or null once older ones were loaded too
+  getStartDate(): string | null {
+    return this.startDate;
+  }
+
+  // Fetch the changes since the last sync and merge them into the local copy
+  async refresh() {
+    const data = await syncAPI.changesSince(this.version ?? undefined, this.startDate ?? undefined);
+
+    if (data.full) {
+      this.transactions = data.transactions;
+      this.budgets = data.budgets;
+    } else if (data.version !== this.version) {
+      const changedIds = new Set<number>([
+        ...data.deleted.transactions,
+        ...data.transactions.map((t: SyncedTransaction) => t.id),
+      ]);
+      this.transactions = [
+        ...this.transactions.filter(t => !changedIds.has(t.id)),
+        // Rows changed to a date before the loaded range are dropped like deleted ones
+        ...data.transactions.filter((t: SyncedTransaction) => !this.startDate || t.date >= this.startDate),
+      ].sort((a, b) => a.id - b.id);
+      // Budget totals depend on every transaction, so the server resends all budgets on any change
+      this.budgets = data.budgets;
+    }
+    this.version = data.version;
+
+    categoryStore.setCategories(this.budgets);
+    this.notifyListeners();
+  }
+
+  // Drop the date limit and load the full history, archived years included
+  async loadOlder() {
+    this.startDate = null;
+    this.version = null;
+    await this.refresh();
+  }
+
+  // Forget the local copy, e.g. when another user logs in
+  reset() {
+    this.transactions = [];
+    this.budgets = [];
+    this.version = null;
+    this.startDate = recentStartDate();
+    this.notifyListeners();
+  }
+
+  subscribe(listener: () => void) {
+    this.listeners.push(listener);
+    return () => {
+      this.listeners = this.listeners.filter(l => l !== listener);
+    };
+  }
+
+  private notifyListeners() {
+    this.listeners.forEach(listener => listener());
+  }
+}
+
+export const syncStore = new SyncStore();
+export { RECENT_MONTHS };
+export type { SyncedTransaction, SyncedBudget };